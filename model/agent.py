@@ -8,6 +8,9 @@ import random
 
 from network import NeuralNet2Layer, NeuralNet1Layer
 from replayMemory import ReplayMemory
+from frameReplayMemory import FrameReplayMemory
+from batchPrefetcher import BatchPrefetcher
+from distributedLearner import DistributedLearner
 from fileManager import FileManager
 from transition import Transition
 from direction import Direction
@@ -29,10 +32,14 @@ class Agent:
 
         # Instance variables which are loaded from class StaticParameters are explained in class StaticParameters
 
-        self.model = NeuralNet1Layer(self.device)
+        self.model = self.create_model()
         self.optimizer = optim.Adam(self.model.parameters(), lr=StaticParameters.LEARNING_RATE)
 
-        self.memory = ReplayMemory(StaticParameters.REPLAY_MEMORY_CAPACITY)
+        if StaticParameters.REPLAY_STORAGE == 'frame':
+            self.memory = FrameReplayMemory(StaticParameters.REPLAY_MEMORY_CAPACITY, self.device,
+                                            StaticParameters.REPLAY_OBSERVATION_DTYPE)
+        else:
+            self.memory = ReplayMemory(StaticParameters.REPLAY_MEMORY_CAPACITY)
 
         self.eps_start = StaticParameters.EPSILON_START
         self.eps_end = StaticParameters.EPSILON_END
@@ -40,17 +47,58 @@ class Agent:
 
         self.gamma = StaticParameters.GAMMA
         self.batch_size = StaticParameters.BATCH_SIZE
+        self.decision_interval = StaticParameters.DECISION_INTERVAL
 
         self.filename = StaticParameters.MODEL_FILENAME
 
-        self.last_transition = Transition(torch.Tensor(StaticParameters.INPUT, device=self.device).float().unsqueeze(0),
-                                          torch.Tensor(StaticParameters.INPUT, device=self.device).float().unsqueeze(0),
-                                          torch.tensor([0], device=self.device).unsqueeze(0),
-                                          torch.tensor([0], device=self.device))
+        # If enabled, batches are sampled from replay memory on a background thread while the neural net is trained.
+        self.prefetcher = None
+        if StaticParameters.PREFETCH_BATCHES > 0:
+            self.prefetcher = BatchPrefetcher(self.memory, self.samples_per_step(), StaticParameters.PREFETCH_BATCHES)
 
-        # number of completed steps, used for epsilon decay
+        # State and action of the current decision, None before the first decision. The action is repeated for
+        # 'decision_interval' steps, 'decision_reward' is the discounted sum of the rewards of these steps and
+        # 'decision_steps' the number of steps that have been taken so far.
+        self.last_state = None
+        self.last_action = None
+        self.last_direction = None
+        self.decision_reward = 0
+        self.decision_steps = 0
+
+        # number of completed decisions, used for epsilon decay
         self.steps_done = 0
 
+        # When an iteration ends, the current decision ends as well. The transition that spans the reset after a
+        # truncated iteration is not stored in replay memory, because its new state belongs to the next iteration.
+        self.episode_ended = False
+        self.skip_transition = False
+
+        # 'stop_requested' is set once a limit of the training run is reached, 'training_stopped' once the agent has
+        # actually stopped (with several learners, this happens for all learners at the same synchronization).
+        self.stop_requested = False
+        self.training_stopped = False
+
+        # When the application is started as one of several learner processes (see 'distributedTraining.py'), the
+        # gradients are averaged over all learners. All learners start with the weights of rank 0.
+        self.learner = DistributedLearner.from_environment()
+        self.load_requested = False
+        if self.learner is not None:
+            self.learner.broadcast_parameters(self.model, self.optimizer)
+
+    # Method 'create_model':
+    # Creates the neural net of the agent. Subclasses can override this method to use a different neural net.
+    def create_model(self):
+        return NeuralNet1Layer(self.device)
+
+    # Number of transitions that are sampled from replay memory for one learning iteration.
+    def samples_per_step(self):
+        return self.batch_size
+
+    # Method 'action_values':
+    # Returns the output of the neural net for 'nn_input', one value for every possible action.
+    def action_values(self, nn_input):
+        return self.model.forward(nn_input)
+
     # Method 'select_action':
     #   Purpose: The output of the neural net contains a value for every possible action. So, somehow the DQN still
     #       needs to determine what action to take next. Essentially, this is done by using the softmax-function
@@ -66,7 +114,7 @@ class Agent:
         self.steps_done = self.steps_done + 1
 
         if random.random() > eps_threshold:
-            nn_output = self.model.forward(nn_input)
+            nn_output = self.action_values(nn_input)
             return nn_output.max(1)[1].view(1, 1)  # take recommendation of the model
 
         return torch.tensor([[random.randrange(3)]], device=self.device)  # choose randomly
@@ -78,64 +126,156 @@ class Agent:
     #       https://pytorch.org/docs/stable/generated/torch.nn.SmoothL1Loss.html). The actual optimization is done
     #       by updating the neural net's weights with backpropagation.
     def optimize_model(self):
-        if not self.memory.has_batch_size(self.batch_size):
+        ready = self.memory.has_batch_size(self.samples_per_step())
+        if self.learner is not None:
+            ready = self.synchronize_learners(ready)
+        if not ready:
             return
 
-        transitions = self.memory.sample(self.batch_size)
-        states, new_states, actions, rewards = transitions
+        if self.prefetcher is not None:
+            transitions = [tensor.to(self.device) for tensor in self.prefetcher.get()]
+        else:
+            transitions = self.memory.sample(self.samples_per_step())
+        states, new_states, actions, rewards, discounts = transitions
 
+        loss = self.compute_loss(states, new_states, actions, rewards, discounts)
+        self.optimizer.zero_grad()  # setting all gradients to zero, so it does not accumulate over time
+        loss.backward()  # calculate backpropagation
+        if self.learner is not None:
+            self.learner.all_reduce_gradients(self.model)  # average gradients over all learners
+        self.optimizer.step()  # update weights according to backpropagation
+
+    # Method 'compute_loss':
+    #   Purpose: Calculates the 'Huber Loss' between the output of the neural net for the sampled transitions and
+    #       the expected values according to the q-learning update rule.
+    #   Return: The loss as tensor with a single element.
+    def compute_loss(self, states, new_states, actions, rewards, discounts):
         output = torch.gather(self.model.forward(states), 1, actions)
         new_output = self.model.forward(new_states).max(1)[0].detach()  # max(Q(a_{t}, s_{t}))
-        expected = rewards + self.gamma * new_output  # R(a_{t}, s_{t},) + y * max(Q(a_{t}, s_{t+1}))
+        # R(a_{t}, s_{t},) + y^k * max(Q(a_{t}, s_{t+k})), where k is the number of steps the action was repeated for
+        expected = rewards + discounts * new_output
 
         # Note: Here, I used 'torch.nn.functional.smooth_l1_loss' instead of 'torch.nn.SmoothL1Loss'. The reason is
         # that the latter is actually calling the former itself but because of its parent class can have a reduction
         # that is different than mean reduction. For this project's agent, this can lead to very inefficient learning.
         # Reference: https://pytorch.org/docs/stable/_modules/torch/nn/modules/loss.html#SmoothL1Loss
-        loss = F.smooth_l1_loss(output.squeeze(1), expected)
-        self.optimizer.zero_grad()  # setting all gradients to zero, so it does not accumulate over time
-        loss.backward()  # calculate backpropagation
-        self.optimizer.step()  # update weights according to backpropagation
+        return F.smooth_l1_loss(output.squeeze(1), expected)
+
+    # Method 'synchronize_learners':
+    #   Purpose: Keeps all learner processes in lockstep. An optimization step is only taken if the replay shards of
+    #       all learners contain a batch. If a model was loaded on any learner, rank 0 loads it from its file and sends
+    #       it to all other learners. If any learner requested to stop, all learners stop.
+    #   Return: Boolean to indicate whether all learners are ready for an optimization step (True) or not (False).
+    def synchronize_learners(self, ready):
+        ready, reload, stop = self.learner.synchronize(ready, self.load_requested, self.stop_requested)
+        self.load_requested = False
+        if reload:
+            if self.learner.is_main_process():
+                self.load_from_file()
+            self.learner.broadcast_parameters(self.model, self.optimizer)
+        if stop:
+            self.stop()
+            return False
+        return ready
 
     # Method 'update':
     #   Purpose: Every time the agent has selected an action, it changes its state in the model. Concrete,
     #       this means new input data is available, which should be used to select the next action, if the state is not
-    #       a final state. This method updates all relevant variables and initiates a new learning iteration by calling
-    #       'optimize_model'.
+    #       a final state. The agent only makes a new decision every 'decision_interval' steps and repeats its last
+    #       action in between. When a decision is made, the transition of the last decision is stored, a new learning
+    #       iteration is initiated by calling 'optimize_model' and the next action is selected.
     #   Parameters:
     #       'reward': reward that resulted from the last action, calculated by class 'Environment'
     #       'new_signal': information about the current state of the agent in the model, provided by class
     #           'AgentVisualization'
     def update(self, reward, new_signal):
+        self.decision_reward = self.decision_reward + self.gamma ** self.decision_steps * reward
+        self.decision_steps = self.decision_steps + 1
+        if self.last_state is not None and self.decision_steps < self.decision_interval and not self.episode_ended:
+            return self.last_direction
+
         new_state = torch.Tensor([new_signal], device=self.device).float()
-        self.last_transition = Transition(self.last_transition[0], new_state,
-                                          self.last_transition[2], self.last_transition[3])
-        self.memory.push(self.last_transition)
+        if self.last_state is not None and not self.skip_transition:
+            self.memory.push(Transition(self.last_state, new_state, self.last_action,
+                                        torch.tensor([float(self.decision_reward)], device=self.device),
+                                        torch.tensor([self.gamma ** self.decision_steps], device=self.device)))
+        self.episode_ended = False
+        self.skip_transition = False
         self.optimize_model()
 
         # compute and update current state
         new_action = self.select_action(new_state)
-        self.last_transition = (new_state, torch.Tensor([StaticParameters.INPUT], device=self.device).float(),
-                                new_action, torch.tensor([reward], device=self.device))
+        self.last_state = new_state
+        self.last_action = new_action
+        self.decision_reward = 0
+        self.decision_steps = 0
 
         # return action of type enum 'Action'
         # not implemented as match pattern (switch/case) because this is only supported from Python 3.10
         if new_action == 0:
-            return Direction.STRAIGHT
-        if new_action == 1:
-            return Direction.RIGHT
-        return Direction.LEFT
+            self.last_direction = Direction.STRAIGHT
+        elif new_action == 1:
+            self.last_direction = Direction.RIGHT
+        else:
+            self.last_direction = Direction.LEFT
+        return self.last_direction
+
+    # Method 'end_episode':
+    # Called by the environment when an iteration has ended, either because the goal was reached or because it reached
+    # the max number of steps per iteration ('truncated').
+    def end_episode(self, truncated):
+        self.episode_ended = True
+        self.skip_transition = truncated
+
+    # Method 'request_stop':
+    # Called by the iteration manager when a limit of the training run is reached. A single agent stops right away,
+    # with several learners the agent stops at the next synchronization, together with all other learners.
+    def request_stop(self):
+        self.stop_requested = True
+        if self.learner is None:
+            self.stop()
+
+    # Method 'stop':
+    # Saves a final checkpoint. Afterwards, the environment does not update the agent anymore.
+    def stop(self):
+        if self.training_stopped:
+            return
+
+        self.save()
+        self.training_stopped = True
+        logging.info('Training stopped.')
 
     # Method 'save':
     # Saving the current state of the neural net to a file so it can be reused and training does not have to start at 0
-    # every time.
+    # every time. With several learners, only rank 0 writes the checkpoint, because all of them hold the same model.
     def save(self):
+        if self.learner is not None and not self.learner.is_main_process():
+            return
+
         FileManager.save_model(self.model, self.optimizer, self.filename)
         logging.info('Model successfully saved.')
 
     # Method 'load':
+    # With several learners, the model is not loaded right away but at the next synchronization of all learners, so
+    # that every learner continues with the same weights.
+    def load(self):
+        if self.learner is not None:
+            self.load_requested = True
+            return
+
+        self.load_from_file()
+
+    # Method 'load_from_file':
     # 'model' and 'optimizer' are passed as reference, so it is not necessary for 'FileManager.load_model' to return
     # anything. Instead it directly sets them to the stored values.
-    def load(self):
+    def load_from_file(self):
         if FileManager.load_model(self.model, self.optimizer, self.filename):
             logging.info('Model successfully loaded.')
+
+    # Method 'shutdown':
+    # Stops the batch prefetcher and leaves the process group of the distributed learners, if there are any.
+    def shutdown(self):
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        if self.learner is not None:
+            self.learner.shutdown()
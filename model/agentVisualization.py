@@ -16,8 +16,8 @@ from staticParameters import StaticParameters
 class AgentVisualization(Widget):
 
     # loading required static parameters
-    GUI_WIDTH = StaticParameters.GUI_WIDTH
-    GUI_HEIGHT = StaticParameters.GUI_HEIGHT
+    WORLD_WIDTH = StaticParameters.WORLD_WIDTH
+    WORLD_HEIGHT = StaticParameters.WORLD_HEIGHT
     AGENT_STEP_SIZE = StaticParameters.AGENT_STEP_SIZE
     wall = StaticParameters.wall
 
@@ -94,22 +94,20 @@ class AgentVisualization(Widget):
     def calculate_sensor_signal(self, x, y):
         x = int(x)
         y = int(y)
-        area = self.wall[x - 10:x + 10, y - 10:y + 10]
-        return int(np.sum(area)) / 400
+        return self.wall.window_sum(x - 10, x + 10, y - 10, y + 10) / 400
 
     # Method 'avoid_out_of_bounce':
-    # If the agent comes too close to one of the application window's edges, its position is corrected away from the
-    # edge. This is necessary, so there is so it does not try to access an out-of-bounce-element of
-    # StaticParameters.wall.
+    # If the agent comes too close to one of the world's edges, its position is corrected away from the edge. This is
+    # necessary, so the agent does not leave the area covered by StaticParameters.wall.
     def avoid_out_of_bounce(self, safety_distance):
         if self.x < safety_distance:
             self.x = safety_distance
-        elif self.x > self.GUI_WIDTH - safety_distance:
-            self.x = self.GUI_WIDTH - safety_distance
+        elif self.x > self.WORLD_WIDTH - safety_distance:
+            self.x = self.WORLD_WIDTH - safety_distance
         elif self.y < safety_distance:
             self.y = safety_distance
-        elif self.y > self.GUI_HEIGHT - safety_distance:
-            self.y = self.GUI_HEIGHT - safety_distance
+        elif self.y > self.WORLD_HEIGHT - safety_distance:
+            self.y = self.WORLD_HEIGHT - safety_distance
 
     # Method 'distance_to_goal':
     # Returns the current distance from the visualized agent's center to the goal, using the Pythagorean theorem.
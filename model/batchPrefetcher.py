@@ -0,0 +1,120 @@
+import logging
+import queue
+import threading
+import time
+
+import torch
+
+from staticParameters import StaticParameters
+
+
+# Class 'BatchPrefetcher':
+#   Purpose: Samples batches from replay memory on a background thread, so the next batches are already prepared while
+#       the agent trains its neural net on the current one. Batches are written into a fixed set of preallocated
+#       tensors, which are reused: 'prefetch_batches' sets wait in a bounded queue and one more set is used by the agent.
+#       A set is only handed back to the background thread when the agent requests its next batch.
+#   Instance Variables:
+#       'ready_batches': Queue of batches that are ready to be used by the agent
+#       'free_buffers': Queue of tensor sets that can be filled with the next batch
+#       'current_buffers': Tensor set of the batch the agent is currently training on
+#       'batches_served', 'waits', 'wait_time': Number of batches handed to the agent, how often the agent had to wait
+#           for a batch and the total time it waited (in seconds)
+class BatchPrefetcher:
+
+    def __init__(self, memory, batch_size, prefetch_batches):
+        self.memory = memory
+        self.batch_size = batch_size
+
+        self.ready_batches = queue.Queue(maxsize=prefetch_batches)
+        self.free_buffers = queue.Queue()
+        for _ in range(prefetch_batches + 1):
+            self.free_buffers.put(self.allocate_buffers())
+        self.current_buffers = None
+
+        self.batches_served = 0
+        self.waits = 0
+        self.wait_time = 0
+
+        self.error = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='BatchPrefetcher', daemon=True)
+        self.thread.start()
+
+    # One tensor per attribute of 'Transition', in the format returned by 'ReplayMemory.sample'.
+    def allocate_buffers(self):
+        return (torch.empty(self.batch_size, StaticParameters.INPUT),
+                torch.empty(self.batch_size, StaticParameters.INPUT),
+                torch.empty(self.batch_size, 1, dtype=torch.int64),
+                torch.empty(self.batch_size),
+                torch.empty(self.batch_size))
+
+    # Method 'run':
+    # Loop of the background thread. It waits until replay memory contains a batch and then keeps the queue of ready
+    # batches filled, until 'close' is called.
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                if not self.memory.has_batch_size(self.batch_size):
+                    self.stop_event.wait(0.01)
+                    continue
+
+                try:
+                    buffers = self.free_buffers.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                self.memory.sample(self.batch_size, out=buffers)
+                while not self.stop_event.is_set():
+                    try:
+                        self.ready_batches.put(buffers, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as error:
+            self.error = error
+            logging.exception('Batch prefetcher stopped because of an error.')
+
+    # Method 'get':
+    #   Purpose: Replaces 'ReplayMemory.sample' for the agent. Must only be called once replay memory contains a batch.
+    #   Return: Tuple of tensors 'state', 'new_state', 'action', 'reward', 'discount', which stay valid until the next
+    #       call of 'get'.
+    def get(self):
+        if self.current_buffers is not None:
+            self.free_buffers.put(self.current_buffers)
+            self.current_buffers = None
+
+        try:
+            buffers = self.ready_batches.get_nowait()
+        except queue.Empty:
+            self.waits = self.waits + 1
+            wait_start = time.perf_counter()
+            buffers = self.wait_for_batch()
+            self.wait_time = self.wait_time + time.perf_counter() - wait_start
+
+        self.current_buffers = buffers
+        self.batches_served = self.batches_served + 1
+        return buffers
+
+    def wait_for_batch(self):
+        while True:
+            try:
+                return self.ready_batches.get(timeout=0.1)
+            except queue.Empty:
+                if not self.thread.is_alive():
+                    raise RuntimeError('Batch prefetcher is not running anymore.') from self.error
+
+    # Returns how many batches were handed to the agent, how often and how long (in seconds) it had to wait for one.
+    def statistics(self):
+        return {
+            'batches': self.batches_served,
+            'waits': self.waits,
+            'wait_time': self.wait_time,
+            'wait_ratio': self.waits / max(self.batches_served, 1)
+        }
+
+    # Method 'close':
+    # Stops the background thread and logs the statistics.
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+        logging.info('Batch prefetcher statistics: ' + str(self.statistics()))
@@ -0,0 +1,92 @@
+import os
+import logging
+
+import torch
+import torch.distributed as dist
+
+from staticParameters import StaticParameters
+
+
+# Class 'DistributedLearner':
+#   Purpose: Makes it possible to train one model with several learner processes, either on one machine or across
+#       multiple nodes. Every learner collects experience in its own replay memory (its replay shard) and samples its
+#       batches only from there. After every backpropagation, the gradients of all learners are averaged with an
+#       all-reduce, so every learner applies the same update and all models stay identical.
+#   Instance Variables:
+#       'rank': Number of this learner process, between 0 and 'world_size' - 1. Rank 0 is the main process.
+#       'world_size': Total number of learner processes.
+#   Reference: https://pytorch.org/tutorials/intermediate/dist_tuto.html
+class DistributedLearner:
+
+    def __init__(self, rank, world_size):
+        os.environ.setdefault('MASTER_ADDR', StaticParameters.DISTRIBUTED_MASTER_ADDRESS)
+        os.environ.setdefault('MASTER_PORT', StaticParameters.DISTRIBUTED_MASTER_PORT)
+
+        self.rank = rank
+        self.world_size = world_size
+
+        dist.init_process_group(StaticParameters.DISTRIBUTED_BACKEND, rank=rank, world_size=world_size)
+        logging.info('Learner ' + str(rank) + ' of ' + str(world_size) + ' joined the process group.')
+
+    # Method 'from_environment':
+    #   Purpose: Learner processes are configured with the environment variables 'RANK' and 'WORLD_SIZE', which are set
+    #       by 'distributedTraining.py' or by 'torchrun'.
+    #   Return: A new instance of 'DistributedLearner' or None, if the application runs as a single process.
+    @staticmethod
+    def from_environment():
+        world_size = int(os.environ.get('WORLD_SIZE', 1))
+        if world_size < 2:
+            return None
+
+        return DistributedLearner(int(os.environ['RANK']), world_size)
+
+    # Only the main process is supposed to write checkpoints, as all learners hold the same model.
+    def is_main_process(self):
+        return self.rank == 0
+
+    # Method 'synchronize':
+    #   Purpose: All learners have to run the same number of optimization steps, otherwise the all-reduce of one
+    #       learner would wait for a partner that never joins. Before every step, the learners therefore agree on
+    #       whether all of them have enough transitions in their replay shard, whether a model has to be reloaded and
+    #       whether the training has to be stopped.
+    #   Parameters:
+    #       'ready': True, if this learner's replay shard contains at least one batch.
+    #       'reload': True, if a model reload was requested on this learner.
+    #       'stop': True, if this learner has reached a limit of the training run.
+    #   Return: Tuple of three booleans, whether all learners are ready, whether any learner requested a reload and
+    #       whether any learner requested to stop.
+    def synchronize(self, ready, reload, stop):
+        flags = torch.tensor([0 if ready else 1, 1 if reload else 0, 1 if stop else 0])
+        dist.all_reduce(flags, op=dist.ReduceOp.MAX)
+        return flags[0].item() == 0, flags[1].item() == 1, flags[2].item() == 1
+
+    # Method 'broadcast_parameters':
+    #   Purpose: Overwrites the parameters of the model, and optionally the state of the optimizer, on all learners
+    #       with the ones of rank 0. This is done once at start and every time rank 0 loads a model from a file.
+    def broadcast_parameters(self, model, optimizer=None):
+        for tensor in model.state_dict().values():
+            dist.broadcast(tensor, src=0)
+
+        if optimizer is not None:
+            optimizer_state = [optimizer.state_dict() if self.is_main_process() else None]
+            dist.broadcast_object_list(optimizer_state, src=0)
+            if not self.is_main_process():
+                optimizer.load_state_dict(optimizer_state[0])
+
+    # Method 'all_reduce_gradients':
+    #   Purpose: Replaces the gradients of the model by their average over all learners. The gradients are flattened
+    #       into a single tensor first, so there is only one all-reduce per optimization step instead of one per layer.
+    def all_reduce_gradients(self, model):
+        gradients = [parameter.grad for parameter in model.parameters() if parameter.grad is not None]
+        flat_gradients = torch.cat([gradient.view(-1) for gradient in gradients])
+        dist.all_reduce(flat_gradients, op=dist.ReduceOp.SUM)
+        flat_gradients.div_(self.world_size)
+
+        offset = 0
+        for gradient in gradients:
+            gradient.copy_(flat_gradients[offset:offset + gradient.numel()].view_as(gradient))
+            offset = offset + gradient.numel()
+
+    def shutdown(self):
+        if dist.is_initialized():
+            dist.destroy_process_group()
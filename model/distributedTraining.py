@@ -0,0 +1,89 @@
+import os
+import sys
+
+import torch
+import torch.multiprocessing as mp
+
+from staticParameters import StaticParameters
+from resourcePolicy import ResourcePolicy
+
+
+# Starting point for data-parallel training with several learner processes on one machine. Every learner opens its own
+# application window, collects experience in its own replay memory and shares its gradients with all other learners
+# over localhost. The application can be launched from the console with
+#
+#   python distributedTraining.py <number of learners> [<save file> [<load file>]]
+#
+# To distribute the learners across several nodes, 'rlAgent.py' can be started with 'torchrun' instead, e.g.
+#
+#   torchrun --nnodes=2 --nproc_per_node=2 --master_addr=<address of node 0> --master_port=29500 rlAgent.py
+#
+# Passing '--check' as first argument starts the learners without a GUI. They train on random transitions and verify
+# that all of them end up with the same weights, which makes it possible to test the setup on a machine without a
+# display.
+
+
+# Function 'configure_learner':
+# Sets the environment variables that are read by 'DistributedLearner.from_environment'. This has to happen before
+# class 'Agent' is instantiated, which is the case as soon as module 'environment' is imported.
+def configure_learner(rank, world_size, arguments):
+    os.environ['RANK'] = str(rank)
+    os.environ['LOCAL_RANK'] = str(rank)
+    os.environ['WORLD_SIZE'] = str(world_size)
+    os.environ['LOCAL_WORLD_SIZE'] = str(world_size)
+    os.environ.setdefault('MASTER_ADDR', StaticParameters.DISTRIBUTED_MASTER_ADDRESS)
+    os.environ.setdefault('MASTER_PORT', StaticParameters.DISTRIBUTED_MASTER_PORT)
+
+    # 'FileManager' reads the names of the model files from the command line arguments
+    sys.argv = [sys.argv[0]] + arguments
+
+    ResourcePolicy('learner').apply()
+
+
+def run_learner(rank, world_size, arguments):
+    configure_learner(rank, world_size, arguments)
+
+    from rlAgent import RLAgentApp
+    RLAgentApp().run()
+
+
+def check_learner(rank, world_size, arguments, steps=20):
+    configure_learner(rank, world_size, arguments)
+
+    import torch.distributed as dist
+    from agent import Agent
+    from transition import Transition
+
+    agent = Agent()
+    for _ in range(agent.batch_size):
+        agent.memory.push(Transition(torch.rand(1, StaticParameters.INPUT), torch.rand(1, StaticParameters.INPUT),
+                                     torch.randint(StaticParameters.OUTPUT, (1, 1)), torch.rand(1),
+                                     torch.tensor([agent.gamma])))
+    for _ in range(steps):
+        agent.optimize_model()
+
+    checksum = torch.stack([parameter.detach().sum() for parameter in agent.model.parameters()]).cpu()
+    checksums = [torch.zeros_like(checksum) for _ in range(world_size)]
+    dist.all_gather(checksums, checksum)
+    agent.shutdown()
+
+    if not all(torch.equal(checksum, other) for other in checksums):
+        raise RuntimeError('Learner ' + str(rank) + ' has different weights than the other learners.')
+    print('Learner ' + str(rank) + ': weights are in sync after ' + str(steps) + ' optimization steps.')
+
+
+if __name__ == '__main__':
+    launch = run_learner
+    arguments = sys.argv[1:]
+    if len(arguments) > 0 and arguments[0] == '--check':
+        launch = check_learner
+        arguments = arguments[1:]
+
+    world_size = StaticParameters.DISTRIBUTED_WORLD_SIZE
+    if len(arguments) > 0:
+        world_size = int(arguments[0])
+        arguments = arguments[1:]
+
+    # the learners read the number of BLAS threads when they load numpy, so it has to be set before they are started
+    ResourcePolicy('learner').export_blas_threads()
+    mp.spawn(launch, args=(world_size, arguments), nprocs=world_size)
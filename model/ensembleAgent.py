@@ -0,0 +1,117 @@
+import logging
+
+import torch
+import torch.optim as optim
+import torch.nn.functional as F  # The 'functional' module contains loss-functions for neural networks.
+
+from agent import Agent
+from ensembleNetwork import EnsembleNetwork
+from network import NeuralNet1Layer, NeuralNet2Layer
+from fileManager import FileManager
+from staticParameters import StaticParameters
+
+
+# Class 'EnsembleAgent':
+#   This class trains several independent neural nets (members) at once, e.g. to compare different random
+#   initializations or hidden layer sizes, without starting one application per neural net. All members are combined in
+#   an 'EnsembleNetwork', so every call of 'optimize_model' trains all of them with a single forward and backward pass.
+#   Every member learns from its own batch of transitions sampled from the shared replay memory. The members take turns
+#   in selecting the agent's actions, switching after every iteration.
+#   Since the optimizer (Adam) works element-wise, every member has its own optimizer state within the stacked tensors.
+#   Every member is saved to and loaded from its own file, in the same format as the model of class 'Agent'.
+class EnsembleAgent(Agent):
+
+    NETWORK_TYPES = {'NeuralNet1Layer': NeuralNet1Layer, 'NeuralNet2Layer': NeuralNet2Layer}
+
+    def __init__(self, hidden_sizes):
+        # has to be set before 'Agent.__init__', which calls 'create_model'
+        self.hidden_sizes = hidden_sizes
+        self.acting_member = 0
+
+        super(EnsembleAgent, self).__init__()
+
+    def create_model(self):
+        network_type = self.NETWORK_TYPES[StaticParameters.ENSEMBLE_NETWORK]
+        members = [network_type(self.device, *sizes) for sizes in self.hidden_sizes]
+        return EnsembleNetwork(members, self.device)
+
+    # every member is trained on its own batch
+    def samples_per_step(self):
+        return self.batch_size * self.model.number_of_members()
+
+    # Only the output of the member whose turn it is decides on the next action.
+    def action_values(self, nn_input):
+        members = self.model.number_of_members()
+        return self.model.forward(nn_input.unsqueeze(0).expand(members, -1, -1))[self.acting_member]
+
+    # Method 'compute_loss':
+    #   Purpose: The sampled transitions are split into one batch per member. The loss of the ensemble is the sum of
+    #       the mean loss of every member, which gives every member the same gradients as if it was trained alone.
+    def compute_loss(self, states, new_states, actions, rewards, discounts):
+        shape = (self.model.number_of_members(), self.batch_size)
+
+        output = torch.gather(self.model.forward(states.view(*shape, -1)), 2, actions.view(*shape, 1)).squeeze(2)
+        new_output = self.model.forward(new_states.view(*shape, -1)).max(2)[0].detach()
+        expected = rewards.view(*shape) + discounts.view(*shape) * new_output
+
+        return F.smooth_l1_loss(output, expected, reduction='none').mean(1).sum()
+
+    def end_episode(self, truncated):
+        super(EnsembleAgent, self).end_episode(truncated)
+        self.acting_member = (self.acting_member + 1) % self.model.number_of_members()
+
+    # Method 'export_member':
+    #   Return: A separate neural net with the weights of member 'index' and an optimizer with its optimizer state.
+    def export_member(self, index):
+        member = self.model.export_member(index)
+        member_optimizer = optim.Adam(member.parameters(), lr=StaticParameters.LEARNING_RATE)
+
+        for parameter, (stacked, part) in zip(member.parameters(), self.model.member_parameters(index)):
+            state = self.optimizer.state.get(stacked)
+            if state:
+                member_optimizer.state[parameter] = {key: value[part].clone() if self.is_stacked(value) else value
+                                                     for key, value in state.items()}
+        return member, member_optimizer
+
+    # Method 'import_member':
+    # Overwrites member 'index' with the weights and optimizer state of a separate neural net and its optimizer.
+    # Note that the number of optimizer steps is shared by all members.
+    def import_member(self, index, member, member_optimizer):
+        self.model.import_member(index, member)
+
+        for parameter, (stacked, part) in zip(member.parameters(), self.model.member_parameters(index)):
+            member_state = member_optimizer.state.get(parameter)
+            if not member_state:
+                continue
+
+            state = self.optimizer.state[stacked]
+            for key, value in member_state.items():
+                if self.is_stacked(value):
+                    if key not in state:
+                        state[key] = torch.zeros_like(stacked)
+                    state[key][part] = value.to(stacked.device)
+                else:
+                    state[key] = value
+
+    # optimizer state that has one value per weight, unlike e.g. the number of steps
+    @staticmethod
+    def is_stacked(value):
+        return torch.is_tensor(value) and value.dim() > 0
+
+    # Method 'save':
+    # Every member is saved to its own file, with the number of the member added to the filename.
+    def save(self):
+        if self.learner is not None and not self.learner.is_main_process():
+            return
+
+        for index in range(self.model.number_of_members()):
+            member, member_optimizer = self.export_member(index)
+            FileManager.save_model(member, member_optimizer, self.filename, member=index)
+        logging.info('Ensemble successfully saved.')
+
+    def load_from_file(self):
+        for index in range(self.model.number_of_members()):
+            member, member_optimizer = self.export_member(index)
+            if FileManager.load_model(member, member_optimizer, self.filename, member=index):
+                self.import_member(index, member, member_optimizer)
+                logging.info('Member ' + str(index) + ' of ensemble successfully loaded.')
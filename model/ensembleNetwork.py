@@ -0,0 +1,92 @@
+import torch
+import torch.nn as nn
+import torch.nn.functional as F  # The 'functional' module contains loss-functions for neural networks.
+
+
+# Class 'EnsembleNetwork':
+#   Purpose: Combines several independent neural nets (members) of type 'NeuralNet1Layer' or 'NeuralNet2Layer' into one
+#       module, so all of them can be used and trained in a single pass instead of one small pass per member. The
+#       weights of every layer are stacked into one tensor with a leading member dimension and the layers are
+#       computed with batched matrix multiplications (torch.baddbmm).
+#       Members may differ in the sizes of their hidden layers, as long as they have the same number of layers. Smaller
+#       layers are padded with zeros. Padded neurons always output 0 and, since the derivative of ReLU at 0 is 0, never
+#       receive a gradient, so they stay 0 and do not influence the member.
+#   Instance Variables:
+#       'weights', 'biases': Stacked weights and biases, one entry per layer of shape (members, out, in) and
+#           (members, out)
+#       'member_types', 'member_sizes': Class and hidden layer sizes of every member, used to export the members
+#   Reference: https://pytorch.org/docs/stable/generated/torch.baddbmm.html
+class EnsembleNetwork(nn.Module):
+
+    def __init__(self, members, device):
+        super(EnsembleNetwork, self).__init__()
+        member_layers = [[module for module in member.children() if isinstance(module, nn.Linear)]
+                         for member in members]
+        if len(set(len(layers) for layers in member_layers)) != 1:
+            raise ValueError('All members of an ensemble need the same number of layers.')
+
+        self.member_types = [type(member) for member in members]
+        self.member_sizes = [[layer.out_features for layer in layers[:-1]] for layers in member_layers]
+
+        self.weights = nn.ParameterList()
+        self.biases = nn.ParameterList()
+        for i in range(len(member_layers[0])):
+            layers = [member[i] for member in member_layers]
+            weight = torch.zeros(len(members), max(layer.out_features for layer in layers),
+                                 max(layer.in_features for layer in layers))
+            bias = torch.zeros(len(members), weight.shape[1])
+            for j, layer in enumerate(layers):
+                weight[j, :layer.out_features, :layer.in_features] = layer.weight.detach()
+                bias[j, :layer.out_features] = layer.bias.detach()
+            self.weights.append(nn.Parameter(weight))
+            self.biases.append(nn.Parameter(bias))
+
+        self.device = device
+        self.to(device)
+
+    # Method 'forward':
+    #   Purpose: Passing samples through all members of the ensemble at once.
+    #   Parameters:
+    #       'input_values': Input values of shape (members, samples, input), every member gets its own samples.
+    #   Return:
+    #       'out': Output of every member, of shape (members, samples, output).
+    def forward(self, input_values):
+        x = input_values.to(self.device)
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = torch.baddbmm(bias.unsqueeze(1), x, weight.transpose(1, 2))
+            if i < len(self.weights) - 1:
+                x = F.relu(x)
+        return x
+
+    def number_of_members(self):
+        return len(self.member_types)
+
+    # Method 'member_parameters':
+    #   Purpose: Relates the parameters of a single member to the stacked parameters of the ensemble.
+    #   Return: List with one entry per parameter of the member, in the order of 'member.parameters()'. Each entry
+    #       contains the stacked parameter of the ensemble and the index of the member's part within it.
+    def member_parameters(self, index):
+        layers = self.member_sizes[index] + [self.weights[-1].shape[1]]
+        inputs = [self.weights[0].shape[2]] + self.member_sizes[index]
+
+        parameters = []
+        for weight, bias, out_features, in_features in zip(self.weights, self.biases, layers, inputs):
+            parameters.append((weight, (index, slice(0, out_features), slice(0, in_features))))
+            parameters.append((bias, (index, slice(0, out_features))))
+        return parameters
+
+    # Method 'export_member':
+    #   Return: A new neural net of the member's type, with the member's current weights.
+    def export_member(self, index):
+        member = self.member_types[index](self.device, *self.member_sizes[index])
+        with torch.no_grad():
+            for parameter, (stacked, part) in zip(member.parameters(), self.member_parameters(index)):
+                parameter.copy_(stacked[part])
+        return member
+
+    # Method 'import_member':
+    # Overwrites the weights of a member with the ones of a neural net of the same type and size.
+    def import_member(self, index, member):
+        with torch.no_grad():
+            for parameter, (stacked, part) in zip(member.parameters(), self.member_parameters(index)):
+                stacked[part] = parameter.to(self.device)
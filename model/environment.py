@@ -1,13 +1,14 @@
 from kivy.uix.widget import Widget
-from kivy.properties import ObjectProperty
+from kivy.properties import ObjectProperty, NumericProperty, ReferenceListProperty
 from kivy.vector import Vector
 
-import numpy as np
 import logging
 
 from staticParameters import StaticParameters
 from agent import Agent
+from ensembleAgent import EnsembleAgent
 from iterationManager import IterationManager
+from plateauDetector import PlateauDetector
 
 
 # Class 'Environment':
@@ -18,6 +19,8 @@ class Environment(Widget):
     # loading required static parameters
     GUI_WIDTH = StaticParameters.GUI_WIDTH
     GUI_HEIGHT = StaticParameters.GUI_HEIGHT
+    WORLD_WIDTH = StaticParameters.WORLD_WIDTH
+    WORLD_HEIGHT = StaticParameters.WORLD_HEIGHT
     AGENT_STEP_SIZE = StaticParameters.AGENT_STEP_SIZE
     wall = StaticParameters.wall
 
@@ -25,12 +28,21 @@ class Environment(Widget):
     # specified in file 'rlagent.kv'
     agentVisualization = ObjectProperty(None)
 
+    # Lower left corner of the section of the world that is displayed in the GUI. The agent and wall visualizations are
+    # shifted by this position, which follows the agent if the world is larger than the GUI.
+    viewport_x = NumericProperty(0)
+    viewport_y = NumericProperty(0)
+    viewport = ReferenceListProperty(viewport_x, viewport_y)
+
     # 'agent' represents the reinforcement learning agent from the module 'deepQLearning'
-    agent = Agent()
+    if len(StaticParameters.ENSEMBLE_HIDDEN_SIZES) > 1:
+        agent = EnsembleAgent(StaticParameters.ENSEMBLE_HIDDEN_SIZES)
+    else:
+        agent = Agent()
 
     # goal for the agent as a position in the model (actual goal is a circle of certain diameter around this
     # position)
-    goal = (GUI_WIDTH - 60, GUI_HEIGHT - 60)
+    goal = (WORLD_WIDTH - 60, WORLD_HEIGHT - 60)
 
     # Specifies the maximal number of iterations for the agent to learn. After the agent has gone through this number of
     # iterations the application will save the model and exit.
@@ -38,7 +50,14 @@ class Environment(Widget):
 
     # The model has an iteration manager, which determines when an iteration is finished and how many iterations
     # the agent goes through.
-    iteration_manager = IterationManager(max_iterations)
+    plateau_detector = None
+    if StaticParameters.PLATEAU_PATIENCE is not None:
+        plateau_detector = PlateauDetector(StaticParameters.PLATEAU_WINDOW, StaticParameters.PLATEAU_PATIENCE,
+                                           StaticParameters.PLATEAU_MIN_DELTA)
+    iteration_manager = IterationManager(max_iterations, max_episode_steps=StaticParameters.MAX_EPISODE_STEPS,
+                                         max_total_steps=StaticParameters.MAX_TOTAL_STEPS,
+                                         max_training_seconds=StaticParameters.MAX_TRAINING_SECONDS,
+                                         plateau_detector=plateau_detector)
 
     # The 'current_reward' denotes the received reward for the last action that the agent took.
     current_reward = 0
@@ -53,8 +72,7 @@ class Environment(Widget):
     distance_to_goal = 0
 
     def init_wall(self):
-        StaticParameters.wall = np.zeros((self.GUI_WIDTH, self.GUI_HEIGHT))
-        self.wall = StaticParameters.wall
+        self.wall.clear()
 
     # Method 'start':
     # Starting point for every iteration. The agent is set to its starting position in the model and receives a
@@ -63,6 +81,8 @@ class Environment(Widget):
         self.agentVisualization.start(Vector(100, 100), Vector(self.AGENT_STEP_SIZE, 0))
         self.cumulative_reward = 0
         self.walls_touched = 0
+        self.iteration_manager.episode_steps = 0
+        self.follow_agent()
 
     # Method 'update':
     #   Purpose: This method is called in a regular time interval from the kivy application. Every call leads to the
@@ -72,15 +92,17 @@ class Environment(Widget):
     #           2. retrieving the next direction from the neural net. 'next_direction' is of type
     #           helperClasses.Direction.
     #           3. trigger the agent visualization to change its position according to the calculated 'next_direction'
-    #           4. checking if the agent has reached the goal
+    #           4. checking if the agent has reached the goal or the iteration has run out of steps
     #           5. setting the new reward
     #           6. updating the current distance to the goal
     #   Parameters: The kivy.clock.Clock interval scheduler calls a method with one parameter, which in this case
     #       is not required. An IDE warning can be ignored but the parameter should not be removed.
+    #   Return: Boolean to indicate whether the training continues (True) or has been stopped (False).
     def update(self, dt):
         nn_input = self.agentVisualization.get_signal(self.goal)  # 1.
         next_direction = self.agent.update(self.current_reward, nn_input)  # 2.
         self.agentVisualization.move(next_direction)  # 3.
+        self.follow_agent()
 
         # The iteration manager is called to check if a new iteration is supposed to begin. This is the case whenever
         # the agent reached its goal or comes sufficiently close to it. If this is the case the agent starts again at
@@ -90,20 +112,33 @@ class Environment(Widget):
         iteration_finished = self.iteration_manager.check_iteration(new_distance_to_goal, self.agent,
                                                                     self.cumulative_reward, self.walls_touched)  # 4.
 
-        self.calculate_reward(iteration_finished)  # 5.
+        goal_reached = iteration_finished and not self.iteration_manager.truncated
+        self.calculate_reward(goal_reached)  # 5.
         self.distance_to_goal = new_distance_to_goal  # 6.
 
         if iteration_finished:
+            self.agent.end_episode(self.iteration_manager.truncated)
             self.start()
 
+        return not self.agent.training_stopped
+
+    # Method 'follow_agent':
+    # Moves the displayed section of the world, so the agent stays in its center. The section never extends beyond the
+    # edges of the world, so for a world of the size of the GUI, it does not move at all.
+    def follow_agent(self):
+        self.viewport_x = min(max(self.agentVisualization.center_x - self.GUI_WIDTH / 2, 0),
+                              max(self.WORLD_WIDTH - self.GUI_WIDTH, 0))
+        self.viewport_y = min(max(self.agentVisualization.center_y - self.GUI_HEIGHT / 2, 0),
+                              max(self.WORLD_HEIGHT - self.GUI_HEIGHT, 0))
+
     # Method 'calculate_reward':
     # For every action it takes, the agent receives a reward which can be positive or negative. This method calculates
     # the rewards after every taken action and differentiates between wall and no wall.
-    def calculate_reward(self, iteration_finished):
+    def calculate_reward(self, goal_reached):
         self.agentVisualization.avoid_out_of_bounce(20)
 
         # reward for goal
-        if iteration_finished:
+        if goal_reached:
             self.update_rewards(200)
 
         # reward for wall
@@ -13,11 +13,13 @@ logging.basicConfig(filename='model.log', encoding='utf-8', level=logging.DEBUG)
 class FileManager:
 
     # Save model and optimizer to a separate file with name 'filename'. 'filename' is either overwritten or newly
-    # created in the same directory.
+    # created in the same directory. For a member of an ensemble, the number of the member is added to the filename.
     @staticmethod
-    def save_model(model, optimizer, filename):
+    def save_model(model, optimizer, filename, member=None):
         if len(sys.argv) > 1:
             filename = 'lastModel/' + sys.argv[1]
+        if member is not None:
+            filename = FileManager.member_filename(filename, member)
 
         parameter_dict = {
             'model': model.state_dict(),
@@ -27,9 +29,11 @@ class FileManager:
 
     # Load model and optimizer from a file with name 'filename' in the same directory, if the file exists
     @staticmethod
-    def load_model(model, optimizer, filename):
+    def load_model(model, optimizer, filename, member=None):
         if len(sys.argv) > 2:
             filename = 'lastModel/' + sys.argv[2]
+        if member is not None:
+            filename = FileManager.member_filename(filename, member)
 
         if not os.path.isfile(filename):
             logging.warning('File ' + filename + ' was not found when trying to load the model.')
@@ -39,3 +43,9 @@ class FileManager:
         model.load_state_dict(file_data['model'])
         optimizer.load_state_dict(file_data['optimizer'])
         return True
+
+    # Filename of the member with number 'member' of an ensemble, e.g. 'lastModel/trained_model_member2.pt'
+    @staticmethod
+    def member_filename(filename, member):
+        name, extension = os.path.splitext(filename)
+        return name + '_member' + str(member) + extension
@@ -0,0 +1,131 @@
+import random
+import threading
+
+import numpy as np
+import torch
+
+from staticParameters import StaticParameters
+
+
+# Class 'FrameReplayMemory':
+#   Purpose: Alternative to 'ReplayMemory', which needs considerably less memory per transition. Since the new state of
+#       one transition is the state of the next transition, every observation (frame) is only stored once in a ring
+#       buffer and the new state of a transition is looked up by index. Observations can additionally be stored with
+#       reduced precision ('float16' or 'uint8') and are converted back to float32 for an entire batch when sampling.
+#       If a pushed transition does not continue the last one (e.g. because a new episode began), the next state of the
+#       last transition is kept separately, so no transition ever returns a frame of a different episode.
+#   Instance Variables:
+#       'capacity': Maximum number of transitions that can be stored in replay memory
+#       'frames': Observations, one more than 'capacity' because the newest transition also needs its new state
+#       'actions', 'rewards', 'discounts': Action, reward and discount of every stored transition
+#       'boundary_frames': New states of transitions at which the sequence of observations was interrupted
+#       'count': Total number of transitions pushed so far, transition number i is stored at index i % 'capacity'
+class FrameReplayMemory(object):
+
+    # numpy data types for the supported values of 'StaticParameters.REPLAY_OBSERVATION_DTYPE'
+    STORAGE_TYPES = {'float32': np.float32, 'float16': np.float16, 'uint8': np.uint8}
+
+    def __init__(self, capacity, device, observation_dtype='float32'):
+        if observation_dtype not in self.STORAGE_TYPES:
+            raise ValueError('Unknown observation data type ' + str(observation_dtype) + ' for replay memory.')
+        # the new state of a transition before an interruption is kept in the slot of that transition, which would be
+        # overwritten right away if there was only one slot
+        if capacity < 2:
+            raise ValueError('Replay memory with frame storage needs a capacity of at least 2.')
+
+        self.capacity = capacity
+        self.device = device
+        self.observation_dtype = observation_dtype
+
+        self.frames = np.zeros((capacity + 1, StaticParameters.INPUT), dtype=self.STORAGE_TYPES[observation_dtype])
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.discounts = np.zeros(capacity, dtype=np.float32)
+        self.boundary_frames = {}
+        self.count = 0
+
+        # 'uint8' maps the range between the lowest and highest possible value of every signal to 0...255
+        self.low = np.array(StaticParameters.OBSERVATION_LOW, dtype=np.float32)
+        self.scale = (np.array(StaticParameters.OBSERVATION_HIGH, dtype=np.float32) - self.low) / 255
+
+        # new state of the last pushed transition, used to detect whether the next transition continues it
+        self.last_new_state = None
+
+        self.lock = threading.Lock()  # 'BatchPrefetcher' samples from another thread
+
+    # Method 'push':
+    #   Purpose: Used to store a new transition in memory. In case, the number of stored transitions already equals
+    #   'capacity', the oldest stored transition is overwritten.
+    #   Parameters:
+    #       'transition': New transition to be stored
+    def push(self, transition):
+        with self.lock:
+            state, new_state, action, reward, discount = transition
+            slot = self.count % self.capacity
+            state_frame = self.count % (self.capacity + 1)
+            new_state_frame = (self.count + 1) % (self.capacity + 1)
+
+            self.boundary_frames.pop(slot, None)  # the transition previously stored in this slot is overwritten
+
+            if state is not self.last_new_state:
+                # the frame which is about to be overwritten is the new state of the last transition
+                if self.count > 0:
+                    self.boundary_frames[(self.count - 1) % self.capacity] = self.frames[state_frame].copy()
+                self.frames[state_frame] = self.quantize(state)
+
+            self.frames[new_state_frame] = self.quantize(new_state)
+            self.actions[slot] = action.item()
+            self.rewards[slot] = reward.item()
+            self.discounts[slot] = discount.item()
+
+            self.last_new_state = new_state
+            self.count = self.count + 1
+
+    # Method 'sample':
+    #   Purpose: Providing a random choice of sample transitions for the agent to learn from.
+    #   Parameters:
+    #       'batch_size': Number of samples to return.
+    #       'out': Optional tensors, one per attribute of 'Transition', which the batch is written into instead of
+    #           newly allocated tensors.
+    #   Return:
+    #       Tuple of tensors 'state', 'new_state', 'action', 'reward', 'discount', in the same format as
+    #       'ReplayMemory.sample'.
+    def sample(self, batch_size, out=None):
+        with self.lock:
+            stored = min(self.count, self.capacity)
+            numbers = np.array(random.sample(range(self.count - stored, self.count), batch_size))
+            slots = numbers % self.capacity
+
+            states = self.frames[numbers % (self.capacity + 1)]
+            new_states = self.frames[(numbers + 1) % (self.capacity + 1)]
+            if self.boundary_frames:
+                for i, slot in enumerate(slots):
+                    if slot in self.boundary_frames:
+                        new_states[i] = self.boundary_frames[slot]
+
+            batch = (self.dequantize(states), self.dequantize(new_states),
+                     self.actions[slots].astype(np.int64).reshape(-1, 1), self.rewards[slots], self.discounts[slots])
+
+        if out is not None:
+            for values, buffer in zip(batch, out):
+                buffer.copy_(torch.from_numpy(values))
+            return out
+
+        return tuple(torch.from_numpy(values).to(self.device) for values in batch)
+
+    def has_batch_size(self, batch_size):
+        return min(self.count, self.capacity) >= batch_size
+
+    # Converts an observation tensor to a row of 'frames'. Note that 'uint8' is lossy for the wall sensors, whose
+    # values are multiples of 1/400.
+    def quantize(self, observation):
+        values = observation.detach().cpu().numpy().reshape(-1)
+        if self.observation_dtype == 'uint8':
+            return np.clip(np.rint((values - self.low) / self.scale), 0, 255)
+        return values
+
+    # Converts a batch of frames back to float32.
+    def dequantize(self, frames):
+        if self.observation_dtype == 'uint8':
+            return frames.astype(np.float32) * self.scale + self.low
+        return frames.astype(np.float32)
@@ -1,4 +1,5 @@
 import logging
+import time
 
 logging.basicConfig(filename='model.log', encoding='utf-8', level=logging.DEBUG)
 
@@ -7,26 +8,57 @@ logging.basicConfig(filename='model.log', encoding='utf-8', level=logging.DEBUG)
 # Whenever the agent reaches its goal, a new iteration is supposed to start, but only if the maximum number of
 # iterations is not yet exceeded. This class ensures handles all functionality related to these iterations.
 # It also stores iteration specific data in a logfile.
+# Besides the maximum number of iterations, the training run can be limited by a maximum number of steps per iteration
+# (after which the iteration is truncated and a new one begins), a maximum number of steps in total, a maximum training
+# time in seconds and a 'PlateauDetector'. Limits which are set to None are not checked. Once any limit is reached, the
+# agent is asked to stop training, which saves a final checkpoint.
 class IterationManager:
 
-    def __init__(self, max_iterations, current_iteration=0):
+    def __init__(self, max_iterations, current_iteration=0, max_episode_steps=None, max_total_steps=None,
+                 max_training_seconds=None, plateau_detector=None):
         self.max_iterations = max_iterations
         self.current_iteration = current_iteration
+        self.max_episode_steps = max_episode_steps
+        self.max_total_steps = max_total_steps
+        self.max_training_seconds = max_training_seconds
+        self.plateau_detector = plateau_detector
+
+        self.episode_steps = 0
+        self.total_steps = 0
+        # set when the first step is taken, so time before the training is started in the GUI is not counted
+        self.start_time = None
+
+        # True, if the last finished iteration was ended because it reached 'max_episode_steps'
+        self.truncated = False
+        self.training_finished = False
 
     # Method 'check_iteration':
-    #   Purpose: Check, if the agent is currently close enough to the goal, so a new iteration can begin.
+    #   Purpose: Check, if the agent is currently close enough to the goal or has run out of steps, so a new iteration
+    #       can begin. Also checks whether any limit of the training run has been reached.
     #   Returns: Boolean to indicate whether a new iteration should begin (True) or not (False).
     def check_iteration(self, distance, agent, cumulative_reward, walls_touched):
+        if self.start_time is None:
+            self.start_time = time.time()
+        self.episode_steps = self.episode_steps + 1
+        self.total_steps = self.total_steps + 1
+
         next_iteration = self.iteration_finished(distance)
-        if next_iteration:
-            self.max_iterations_reached(agent)
+        self.truncated = not next_iteration and self.iteration_truncated()
+        if next_iteration or self.truncated:
+            if next_iteration:
+                cumulative_reward = cumulative_reward + 200
             logging_message = 'Iteration ' + str(self.current_iteration) + ': '\
-                     + 'Cumulative reward: ' + str(cumulative_reward+200) + ", Walls touched: " + str(walls_touched)
+                + 'Cumulative reward: ' + str(cumulative_reward) + ", Walls touched: " + str(walls_touched)\
+                + ", Steps: " + str(self.episode_steps) + (" (truncated)" if self.truncated else "")
             logging.info(logging_message)
+            self.episode_steps = 0
+
+            self.check_plateau(agent, cumulative_reward)
+            self.max_iterations_reached(agent)
             self.safe_model_iteration(agent)
-            return True
 
-        return False
+        self.check_budget(agent)
+        return next_iteration or self.truncated
 
     def iteration_finished(self, distance):
         # number defines how close the agent has to come to the goal position for the model to count it as
@@ -37,16 +69,42 @@ class IterationManager:
 
         return False
 
-    # ending the application, if the max number of iterations is reached
+    # ending the iteration, if the agent did not reach the goal within the max number of steps
+    def iteration_truncated(self):
+        if self.max_episode_steps is not None and self.episode_steps >= self.max_episode_steps:
+            self.current_iteration = self.current_iteration + 1
+            return True
+
+        return False
+
+    # ending the training, if the max number of iterations is reached
     def max_iterations_reached(self, agent):
         if self.current_iteration > self.max_iterations:
-            agent.save()
-            logging.info('Max number of iterations is reached.')
-            import sys
-            sys.exit()
+            self.finish_training(agent, 'Max number of iterations is reached.')
+
+    # ending the training, if the cumulative rewards have stopped improving
+    def check_plateau(self, agent, cumulative_reward):
+        if self.plateau_detector is not None and self.plateau_detector.update(cumulative_reward):
+            mean, std = self.plateau_detector.statistics()
+            self.finish_training(agent, 'Cumulative reward has reached a plateau (mean: ' + str(mean) + ', std: '
+                                 + str(std) + ').')
+
+    # ending the training, if the max number of steps or the max training time is reached
+    def check_budget(self, agent):
+        if self.max_total_steps is not None and self.total_steps >= self.max_total_steps:
+            self.finish_training(agent, 'Max number of steps is reached.')
+        elif self.max_training_seconds is not None and time.time() - self.start_time >= self.max_training_seconds:
+            self.finish_training(agent, 'Max training time is reached.')
+
+    def finish_training(self, agent, reason):
+        if self.training_finished:
+            return
+
+        logging.info(reason)
+        self.training_finished = True
+        agent.request_stop()
 
     # saving the model every five iterations
     def safe_model_iteration(self, agent):
-        if self.current_iteration % 5 == 0:
+        if self.current_iteration % 5 == 0 and not self.training_finished:
             agent.save()
-
@@ -5,13 +5,15 @@ from staticParameters import StaticParameters
 
 
 # Class 'NeuralNet2Layer':
+#   The size of the hidden layer can be passed to compare variants of the neural net (see 'EnsembleNetwork'), by default
+#   it is taken from 'StaticParameters'.
 #   Reference: https://pytorch.org/tutorials/beginner/blitz/neural_networks_tutorial.html
 class NeuralNet1Layer(nn.Module):
 
-    def __init__(self, device):
+    def __init__(self, device, hidden_1=None):
         super(NeuralNet1Layer, self).__init__()
         self.input_dim = StaticParameters.INPUT
-        self.fc1_dim = StaticParameters.HIDDEN_1
+        self.fc1_dim = StaticParameters.HIDDEN_1 if hidden_1 is None else hidden_1
         self.output_dim = StaticParameters.OUTPUT
 
         self.fc1 = nn.Linear(self.input_dim, self.fc1_dim, bias=True)
@@ -32,14 +34,16 @@ class NeuralNet1Layer(nn.Module):
 
 
 # Class 'NeuralNet2Layer':
+#   The sizes of the hidden layers can be passed to compare variants of the neural net (see 'EnsembleNetwork'), by
+#   default they are taken from 'StaticParameters'.
 #   Reference: https://pytorch.org/tutorials/beginner/blitz/neural_networks_tutorial.html
 class NeuralNet2Layer(nn.Module):
 
-    def __init__(self, device):
+    def __init__(self, device, hidden_1=None, hidden_2=None):
         super(NeuralNet2Layer, self).__init__()
         self.input_dim = StaticParameters.INPUT
-        self.fc1_dim = StaticParameters.HIDDEN_1
-        self.fc2_dim = StaticParameters.HIDDEN_2
+        self.fc1_dim = StaticParameters.HIDDEN_1 if hidden_1 is None else hidden_1
+        self.fc2_dim = StaticParameters.HIDDEN_2 if hidden_2 is None else hidden_2
         self.output_dim = StaticParameters.OUTPUT
 
         self.fc1 = nn.Linear(self.input_dim, self.fc1_dim, bias=True)
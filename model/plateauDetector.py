@@ -0,0 +1,45 @@
+from collections import deque
+
+import numpy as np
+
+
+# Class 'PlateauDetector':
+#   Purpose: Detects when training does not make any more progress. After every iteration, the cumulative reward of the
+#       iteration is added to a rolling window. Whenever the mean of this window exceeds the best mean so far by at
+#       least 'min_delta', the agent is considered to have improved. If it does not improve for 'patience' iterations,
+#       its rewards have reached a plateau.
+#   Instance Variables:
+#       'rewards': Cumulative rewards of the last 'window' iterations
+#       'best_mean': Highest mean of 'rewards' so far
+#       'iterations_without_improvement': Number of iterations since 'best_mean' was last exceeded
+class PlateauDetector:
+
+    def __init__(self, window, patience, min_delta):
+        self.rewards = deque([], maxlen=window)
+        self.patience = patience
+        self.min_delta = min_delta
+
+        self.best_mean = None
+        self.iterations_without_improvement = 0
+
+    # Method 'update':
+    #   Parameters:
+    #       'cumulative_reward': Cumulative reward of the iteration that just finished
+    #   Return: Boolean to indicate whether the rewards have reached a plateau (True) or not (False).
+    def update(self, cumulative_reward):
+        self.rewards.append(cumulative_reward)
+        if len(self.rewards) < self.rewards.maxlen:
+            return False
+
+        mean = np.mean(self.rewards)
+        if self.best_mean is None or mean > self.best_mean + self.min_delta:
+            self.best_mean = mean
+            self.iterations_without_improvement = 0
+        else:
+            self.iterations_without_improvement = self.iterations_without_improvement + 1
+
+        return self.iterations_without_improvement >= self.patience
+
+    # Returns mean and standard deviation of the cumulative rewards in the current window, used for logging.
+    def statistics(self):
+        return np.mean(self.rewards), np.std(self.rewards)
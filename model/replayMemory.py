@@ -1,5 +1,6 @@
 from collections import deque
 import random
+import threading
 
 import torch
 from torch.autograd import Variable  # The 'autograd' module is used to convert tensors into a variable.
@@ -16,6 +17,7 @@ class ReplayMemory(object):
     def __init__(self, capacity):
         self.capacity = capacity
         self.memory = deque([], maxlen=capacity)  # The container datatype 'deque' enables fast appends and pops.
+        self.lock = threading.Lock()  # 'BatchPrefetcher' samples from another thread
 
     # Method 'push':
     #   Purpose: Used to store a new transition in memory. In case, the number of stored transitions already equals
@@ -23,17 +25,27 @@ class ReplayMemory(object):
     #   Parameters:
     #       'transition': New transition to be stored
     def push(self, transition):
-        self.memory.append(transition)
+        with self.lock:
+            self.memory.append(transition)
 
     # Method 'sample':
     #   Purpose: Providing a random choice of sample transitions for the agent to learn from.
     #   Parameters:
     #       'batch_size': Number of samples to return.
+    #       'out': Optional tensors, one per attribute of 'Transition', which the batch is written into instead of
+    #           newly allocated tensors.
     #   Return:
     #       Map of tensors, with one element in the map per attribute of 'Transition', so 'state', 'new_state',
-    #       'action', 'reward'. Each element in the map represents the value for an entire batch.
-    def sample(self, batch_size):
-        samples = zip(*random.sample(self.memory, batch_size))
+    #       'action', 'reward', 'discount'. Each element in the map represents the value for an entire batch.
+    def sample(self, batch_size, out=None):
+        with self.lock:
+            samples = zip(*random.sample(self.memory, batch_size))
+
+        if out is not None:
+            for x, buffer in zip(samples, out):
+                torch.cat(x, dim=0, out=buffer)
+            return out
+
         batch_map = map(lambda x: Variable(torch.cat(x, dim=0)), samples)
         return batch_map
 
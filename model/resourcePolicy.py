@@ -0,0 +1,177 @@
+import os
+import sys
+import logging
+import time
+
+import torch
+import torch.optim as optim
+import torch.nn.functional as F
+
+from network import NeuralNet1Layer
+from ensembleNetwork import EnsembleNetwork
+from ensembleAgent import EnsembleAgent
+from staticParameters import StaticParameters
+
+# 'threadpoolctl' is optional. Without it, the number of BLAS threads is only set through environment variables, which
+# are only read when numpy and PyTorch are loaded. They therefore only affect processes started afterwards (see
+# 'export_blas_threads').
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+
+# Class 'ResourcePolicy':
+#   Purpose: The neural nets of this project are so small that a forward pass can take less time than waking up the
+#       threads of PyTorch's thread pool, and several training processes on one machine easily use more threads than
+#       there are CPU cores. This class applies the thread and CPU settings from 'StaticParameters.RESOURCE_POLICY' for
+#       the role of the current process. It should be applied once, at the start of the process.
+#   Instance Variables:
+#       'role': 'actor', 'learner' or 'evaluator'
+#       'torch_threads', 'interop_threads', 'blas_threads', 'cpu_affinity': Settings of the role, see 'StaticParameters'
+class ResourcePolicy:
+
+    # environment variables read by the common BLAS libraries
+    BLAS_VARIABLES = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']
+
+    def __init__(self, role):
+        if role not in StaticParameters.RESOURCE_POLICY:
+            raise ValueError('Unknown process role ' + str(role) + ' for resource policy.')
+
+        settings = StaticParameters.RESOURCE_POLICY[role]
+        self.role = role
+        self.torch_threads = settings.get('torch_threads')
+        self.interop_threads = settings.get('interop_threads')
+        self.blas_threads = settings.get('blas_threads')
+        self.cpu_affinity = settings.get('cpu_affinity')
+
+    # Method 'apply':
+    # Applies all settings of the role. CPU affinity is set first, so that auto-tuning measures on the cores the process
+    # will actually run on.
+    def apply(self):
+        self.apply_cpu_affinity()
+        self.apply_blas_threads()
+        if StaticParameters.RESOURCE_AUTO_TUNE:
+            self.torch_threads = self.auto_tune()
+        self.apply_torch_threads()
+
+        logging.info('Resource policy for role ' + self.role + ': ' + str(torch.get_num_threads()) + ' torch threads, '
+                     + str(torch.get_num_interop_threads()) + ' interop threads, BLAS threads: '
+                     + str(self.blas_threads) + ', CPU affinity: ' + str(self.cpu_affinity))
+
+    def apply_torch_threads(self):
+        if self.torch_threads is not None:
+            torch.set_num_threads(self.torch_threads)
+
+        # The interop thread pool can only be configured before PyTorch has started any parallel work.
+        if self.interop_threads is not None:
+            try:
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError:
+                logging.warning('Number of interop threads could not be set, parallel work has already started.')
+
+    def apply_blas_threads(self):
+        if self.blas_threads is None:
+            return
+
+        self.export_blas_threads()
+        if threadpool_limits is not None:
+            threadpool_limits(limits=self.blas_threads, user_api='blas')
+        elif 'numpy' in sys.modules or 'torch' in sys.modules:
+            logging.warning('Number of BLAS threads of role ' + self.role + ' has no effect in this process, because '
+                            + 'numpy is already loaded and threadpoolctl is not installed.')
+
+    # Method 'export_blas_threads':
+    # Sets the environment variables for the number of BLAS threads. Child processes inherit them and read them when
+    # they load numpy, so this has to be called before they are started.
+    def export_blas_threads(self):
+        if self.blas_threads is None:
+            return
+
+        for variable in self.BLAS_VARIABLES:
+            os.environ[variable] = str(self.blas_threads)
+
+    def apply_cpu_affinity(self):
+        if self.cpu_affinity is None:
+            return
+
+        if not hasattr(os, 'sched_setaffinity'):
+            logging.warning('CPU affinity is not supported on this operating system.')
+            return
+
+        os.sched_setaffinity(0, self.affinity_cores())
+
+    # Method 'affinity_cores':
+    #   Return: List of CPU cores for this process. With 'rank', the cores currently available are split into equal
+    #       shares and every learner on this machine ('LOCAL_RANK', set by 'distributedTraining.py' or 'torchrun') gets
+    #       its own share.
+    def affinity_cores(self):
+        if self.cpu_affinity != 'rank':
+            return self.cpu_affinity
+
+        available = sorted(os.sched_getaffinity(0))
+        local_rank = int(os.environ.get('LOCAL_RANK', 0))
+        local_world_size = int(os.environ.get('LOCAL_WORLD_SIZE', os.environ.get('WORLD_SIZE', 1)))
+        share = max(len(available) // local_world_size, 1)
+        start = (local_rank * share) % len(available)
+        return available[start:start + share]
+
+    # Method 'auto_tune':
+    #   Purpose: Measures how long the neural net needs for the work of this role with every number of threads in
+    #       'StaticParameters.RESOURCE_AUTO_TUNE_THREADS' (that does not exceed the available cores). An actor or
+    #       evaluator only passes single inputs through the neural net, a learner additionally runs backpropagation and
+    #       an optimizer step on entire batches. The neural net is the one the agent uses (see 'benchmark_model').
+    #   Return: The fastest number of threads.
+    def auto_tune(self, repetitions=50):
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+        candidates = [threads for threads in StaticParameters.RESOURCE_AUTO_TUNE_THREADS if threads <= cores] or [1]
+
+        model, members = self.benchmark_model()
+        optimizer = optim.Adam(model.parameters(), lr=StaticParameters.LEARNING_RATE)
+        batch_size = StaticParameters.BATCH_SIZE if self.role == 'learner' else 1
+        inputs = torch.rand(*members, batch_size, StaticParameters.INPUT)
+        targets = torch.rand(*members, batch_size, StaticParameters.OUTPUT)
+
+        def step():
+            if self.role != 'learner':
+                with torch.no_grad():
+                    model.forward(inputs)
+                return
+            loss = F.smooth_l1_loss(model.forward(inputs), targets)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+        fastest_threads, fastest_duration = None, None
+        for threads in candidates:
+            torch.set_num_threads(threads)
+            for _ in range(5):
+                step()  # warm up the thread pool
+
+            start = time.perf_counter()
+            for _ in range(repetitions):
+                step()
+            duration = (time.perf_counter() - start) / repetitions
+
+            logging.info('Auto-tuning ' + self.role + ': ' + str(threads) + ' threads, ' + str(duration * 1000)
+                         + ' ms per step.')
+            if fastest_duration is None or duration < fastest_duration:
+                fastest_threads, fastest_duration = threads, duration
+
+        return fastest_threads
+
+    # Method 'benchmark_model':
+    #   Purpose: Creates the same kind of neural net as the agent of class 'Environment': an 'EnsembleNetwork' if an
+    #       ensemble is configured, otherwise a 'NeuralNet1Layer'.
+    #   Return: The neural net and the leading dimensions of its inputs, i.e. the number of members of an ensemble. Each
+    #       member processes its own batch, so a learner step covers as many samples as 'EnsembleAgent.samples_per_step'.
+    @staticmethod
+    def benchmark_model():
+        device = torch.device('cpu')
+        hidden_sizes = StaticParameters.ENSEMBLE_HIDDEN_SIZES
+        if len(hidden_sizes) > 1:
+            network_type = EnsembleAgent.NETWORK_TYPES[StaticParameters.ENSEMBLE_NETWORK]
+            members = [network_type(device, *sizes) for sizes in hidden_sizes]
+            return EnsembleNetwork(members, device), (len(members),)
+
+        return NeuralNet1Layer(device), ()
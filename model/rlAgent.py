@@ -8,6 +8,13 @@ from kivy.config import Config
 from agentVisualization import AgentVisualization  # ignore IDE warning of unused import because it is used by kivy
 from wallVisualization import WallVisualization
 from staticParameters import StaticParameters
+from resourcePolicy import ResourcePolicy
+
+# The resource policy has to be applied before module 'environment' is imported, because importing it already creates
+# the agent (and with it the neural net, the batch prefetcher and the process group of the distributed learners).
+if __name__ == '__main__':
+    ResourcePolicy(StaticParameters.RESOURCE_ROLE).apply()
+
 from environment import Environment
 
 # require installed kivy version
@@ -40,18 +47,29 @@ class RLAgentApp(App):
 
     def start(self, obj):
         if not self.clock_active:
-            self.clock = Clock.schedule_interval(self.parent.update, StaticParameters.AGENT_MOVING_ABILITY)
+            self.clock = Clock.schedule_interval(self.update, StaticParameters.AGENT_MOVING_ABILITY)
             self.clock_active = True
 
+    # Method 'update':
+    # Lets the agent take its next step. Once the training has been stopped (e.g. because the max number of iterations
+    # is reached), the clock is unscheduled by returning False and the application is closed.
+    def update(self, dt):
+        if not self.parent.update(dt):
+            self.clock_active = False
+            self.stop()
+            return False
+
+    # Method 'on_stop':
+    # Called when the application is closed, either by the user or because the training has been stopped. Once this
+    # method returns, the kivy event loop ends and 'RLAgentApp.run()' returns to its caller.
     def on_stop(self):
-        import sys
-        sys.exit()
+        self.parent.agent.shutdown()
 
     def draw_goal(self):
         with self.walls.canvas:
             Color(0, 1, 0)
             Ellipse(
-                pos=(StaticParameters.GUI_WIDTH - 120, StaticParameters.GUI_HEIGHT - 120),
+                pos=(StaticParameters.WORLD_WIDTH - 120, StaticParameters.WORLD_HEIGHT - 120),
                 size=(100, 100)
             )
 
@@ -68,6 +86,7 @@ class RLAgentApp(App):
         self.draw_goal()
 
         self.parent.add_widget(self.walls)
+        self.parent.bind(viewport=self.walls.set_viewport)
 
         # define visible user buttons with text, position and method to call 'on_release' and add them to the root
         # widget
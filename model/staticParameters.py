@@ -1,4 +1,4 @@
-import numpy as np
+from tiledWall import TiledWall
 
 
 class StaticParameters:
@@ -22,10 +22,32 @@ class StaticParameters:
     # iterations the application will save the model and exit.
     MAX_ITERATIONS = 1000
 
+    # Further limits of a training run (None means no limit). An iteration that has not reached the goal after
+    # 'MAX_EPISODE_STEPS' steps is truncated and a new iteration begins. After 'MAX_TOTAL_STEPS' steps or
+    # 'MAX_TRAINING_SECONDS' seconds, the application will save the model and exit.
+    MAX_EPISODE_STEPS = None
+    MAX_TOTAL_STEPS = None
+    MAX_TRAINING_SECONDS = None
+
+    # Early stopping: the application will save the model and exit, if the mean cumulative reward over the last
+    # 'PLATEAU_WINDOW' iterations has not improved by at least 'PLATEAU_MIN_DELTA' for 'PLATEAU_PATIENCE' iterations.
+    # Set 'PLATEAU_PATIENCE' to None to disable early stopping.
+    PLATEAU_WINDOW = 20
+    PLATEAU_PATIENCE = None
+    PLATEAU_MIN_DELTA = 1.0
+
     # Width and length of the GUI.
     GUI_WIDTH = 2000
     GUI_HEIGHT = 1500
 
+    # Width and length of the world the agent moves in. If the world is larger than the GUI, the GUI shows a section of
+    # the world around the agent.
+    WORLD_WIDTH = GUI_WIDTH
+    WORLD_HEIGHT = GUI_HEIGHT
+
+    # Width and length of one tile of the wall storage (see class 'TiledWall').
+    WALL_TILE_SIZE = 256
+
     # 2. Deep Learning parameters:
 
     # Path to file where the last saved model can be found and a new model should be saved.
@@ -35,6 +57,11 @@ class StaticParameters:
     # discount factor (set to 1 to erase its effect)
     GAMMA = 0.9
 
+    # Number of steps for which the agent repeats a selected action before it selects the next one. The neural net is
+    # only used and trained once per decision, the rewards of the repeated steps are summed up (discounted with GAMMA)
+    # into one transition.
+    DECISION_INTERVAL = 1
+
     # learning rate for the neural network optimizer (minimum = 0)
     LEARNING_RATE = 0.001
 
@@ -47,9 +74,21 @@ class StaticParameters:
     EPSILON_END = 0.05
     EPSILON_DECAY = 200
 
+    # Number of batches that are sampled from replay memory in advance on a background thread (0 to sample every batch
+    # right before it is used).
+    PREFETCH_BATCHES = 0
+
     # maximum number of transitions to be stored in replay memory
     REPLAY_MEMORY_CAPACITY = 100000
 
+    # Storage of the replay memory. 'transition' stores every transition as tensors (class 'ReplayMemory'), 'frame'
+    # stores every observation only once in an array (class 'FrameReplayMemory'), which needs several times less memory.
+    REPLAY_STORAGE = 'transition'
+
+    # Data type for observations in 'frame' storage: 'float32', 'float16' or 'uint8'. 'uint8' needs the least memory,
+    # but cannot exactly represent the wall sensor values (multiples of 1/400).
+    REPLAY_OBSERVATION_DTYPE = 'float32'
+
     # 3. Neural net layer sizes
 
     # When input size is changed, the actual input array created in class 'AgentVisualization' has to be updated to
@@ -59,8 +98,54 @@ class StaticParameters:
     HIDDEN_2 = 16
     OUTPUT = 3
 
-    # 4. not static variable wall (do not change to an array bigger than '(GUI_WIDTH, GUI_HEIGHT)')
-
-    # Array of same size as the application window. When a wall is drawn onto the model, the respective points
-    # in the array will be set to 1.
-    wall = np.zeros((GUI_WIDTH, GUI_HEIGHT))
+    # Ensemble of neural nets trained at once (see class 'EnsembleAgent'). 'ENSEMBLE_HIDDEN_SIZES' contains one entry per
+    # member with the sizes of its hidden layers, e.g. [[32], [32], [64]] for three members of type 'NeuralNet1Layer'
+    # (an empty entry uses HIDDEN_1 and HIDDEN_2). With less than two members, a single neural net is trained.
+    ENSEMBLE_NETWORK = 'NeuralNet1Layer'
+    ENSEMBLE_HIDDEN_SIZES = []
+
+    # Lowest and highest possible value of every element of the input signal: three wall sensors and the orientation
+    # towards the goal (positive and negative). Used to store observations as 'uint8' in replay memory.
+    OBSERVATION_LOW = [0, 0, 0, -1, -1]
+    OBSERVATION_HIGH = [1, 1, 1, 1, 1]
+
+    # 4. Distributed training parameters
+
+    # Backend used by 'torch.distributed' to all-reduce gradients between learner processes. 'gloo' works on CPU-only
+    # machines and across nodes.
+    DISTRIBUTED_BACKEND = 'gloo'
+
+    # Address and port of the rank 0 learner. These values are only used if the environment variables 'MASTER_ADDR' and
+    # 'MASTER_PORT' are not already set (e.g. by 'torchrun').
+    DISTRIBUTED_MASTER_ADDRESS = '127.0.0.1'
+    DISTRIBUTED_MASTER_PORT = '29500'
+
+    # Number of learner processes started by 'distributedTraining.py' if no number is passed as argument.
+    DISTRIBUTED_WORLD_SIZE = 2
+
+    # 5. CPU resource parameters
+
+    # Thread and CPU settings per role of a process ('actor' only selects actions, 'learner' trains the neural net,
+    # 'evaluator' evaluates a trained neural net), applied by class 'ResourcePolicy' when the process starts.
+    # 'torch_threads' and 'interop_threads' are the sizes of PyTorch's thread pools, 'blas_threads' the size of the
+    # thread pools of the BLAS library used by numpy. 'cpu_affinity' is a list of CPU cores the process may run on, or
+    # 'rank' to split the available cores evenly between the distributed learners on one machine. None keeps the default.
+    RESOURCE_POLICY = {
+        'actor': {'torch_threads': 1, 'interop_threads': 1, 'blas_threads': 1, 'cpu_affinity': None},
+        'learner': {'torch_threads': None, 'interop_threads': None, 'blas_threads': None, 'cpu_affinity': None},
+        'evaluator': {'torch_threads': 1, 'interop_threads': 1, 'blas_threads': 1, 'cpu_affinity': None}
+    }
+
+    # Role of the application, which selects actions and trains the neural net in the same process.
+    RESOURCE_ROLE = 'learner'
+
+    # If True, 'torch_threads' is determined by measuring the time the neural net needs with each of the numbers of
+    # threads in 'RESOURCE_AUTO_TUNE_THREADS' and taking the fastest one.
+    RESOURCE_AUTO_TUNE = False
+    RESOURCE_AUTO_TUNE_THREADS = [1, 2, 4, 8]
+
+    # 6. not static variable wall
+
+    # Tiled array of same size as the world. When a wall is drawn onto the model, the respective points in the array
+    # will be set to 1.
+    wall = TiledWall(WORLD_WIDTH, WORLD_HEIGHT, WALL_TILE_SIZE)
@@ -0,0 +1,104 @@
+import numpy as np
+
+
+# Class 'TiledWall':
+#   Purpose: Storage for the walls of a world that can be much larger than the application window. Instead of one array
+#       of the size of the world, the world is divided into square tiles of 'tile_size' x 'tile_size' points and an
+#       array is only allocated for tiles that contain walls. Missing tiles, as well as points outside of the world,
+#       count as no wall. Hence, memory grows with the amount of drawn walls instead of the size of the world.
+#       A 'TiledWall' can be indexed like the numpy array it replaces, e.g. 'wall[x, y]' or 'wall[x0:x1, y0:y1] = 1'.
+#   Instance Variables:
+#       'width', 'height': Size of the world
+#       'tile_size': Width and height of one tile
+#       'tiles': Map from the tile coordinates (x // 'tile_size', y // 'tile_size') to the tile's array
+class TiledWall:
+
+    def __init__(self, width, height, tile_size):
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.tiles = {}
+
+    def __getitem__(self, key):
+        x, y = key
+        if isinstance(x, slice) or isinstance(y, slice):
+            return self.window(*self.bounds(x, self.width), *self.bounds(y, self.height))
+
+        tile = self.tiles.get((x // self.tile_size, y // self.tile_size))
+        if tile is None or not 0 <= x < self.width or not 0 <= y < self.height:
+            return 0
+        return tile[x % self.tile_size, y % self.tile_size]
+
+    # Only scalar values are supported, which is all that is needed to draw walls.
+    def __setitem__(self, key, value):
+        x_start, x_stop = self.bounds(key[0], self.width)
+        y_start, y_stop = self.bounds(key[1], self.height)
+
+        for (tile_x, tile_y), (tile_x_slice, tile_y_slice), _ in self.overlapping_tiles(x_start, x_stop,
+                                                                                      y_start, y_stop):
+            tile = self.tiles.get((tile_x, tile_y))
+            if tile is None:
+                if value == 0:
+                    continue  # a missing tile already counts as no wall
+                tile = np.zeros((self.tile_size, self.tile_size), dtype=np.uint8)
+                self.tiles[(tile_x, tile_y)] = tile
+            tile[tile_x_slice, tile_y_slice] = value
+
+    # Method 'window':
+    #   Return: Array of the area between 'x_start' and 'x_stop' and between 'y_start' and 'y_stop', assembled from all
+    #       tiles it overlaps.
+    def window(self, x_start, x_stop, y_start, y_stop):
+        area = np.zeros((max(x_stop - x_start, 0), max(y_stop - y_start, 0)), dtype=np.uint8)
+        for tile_coordinates, tile_slices, area_slices in self.overlapping_tiles(x_start, x_stop, y_start, y_stop):
+            tile = self.tiles.get(tile_coordinates)
+            if tile is not None:
+                area[area_slices] = tile[tile_slices]
+        return area
+
+    # Method 'window_sum':
+    #   Purpose: Number of wall points in an area, as needed by the agent's sensors. Unlike 'window', this does not
+    #       copy the area into a new array but sums up the overlapping part of every tile directly.
+    def window_sum(self, x_start, x_stop, y_start, y_stop):
+        x_start, x_stop = max(x_start, 0), min(x_stop, self.width)
+        y_start, y_stop = max(y_start, 0), min(y_stop, self.height)
+
+        total = 0
+        for tile_coordinates, tile_slices, _ in self.overlapping_tiles(x_start, x_stop, y_start, y_stop):
+            tile = self.tiles.get(tile_coordinates)
+            if tile is not None:
+                total = total + int(np.sum(tile[tile_slices]))
+        return total
+
+    # Removes all walls.
+    def clear(self):
+        self.tiles = {}
+
+    # Method 'overlapping_tiles':
+    #   Purpose: Iterates over all tiles that overlap the area between 'x_start' and 'x_stop' and between 'y_start' and
+    #       'y_stop'.
+    #   Return: For every tile its coordinates, the slices of the overlap within the tile and the slices of the overlap
+    #       within the area.
+    def overlapping_tiles(self, x_start, x_stop, y_start, y_stop):
+        if x_stop <= x_start or y_stop <= y_start:
+            return
+
+        for tile_x in range(x_start // self.tile_size, (x_stop - 1) // self.tile_size + 1):
+            x_from = max(x_start, tile_x * self.tile_size)
+            x_to = min(x_stop, (tile_x + 1) * self.tile_size)
+            for tile_y in range(y_start // self.tile_size, (y_stop - 1) // self.tile_size + 1):
+                y_from = max(y_start, tile_y * self.tile_size)
+                y_to = min(y_stop, (tile_y + 1) * self.tile_size)
+                yield ((tile_x, tile_y),
+                       (slice(x_from - tile_x * self.tile_size, x_to - tile_x * self.tile_size),
+                        slice(y_from - tile_y * self.tile_size, y_to - tile_y * self.tile_size)),
+                       (slice(x_from - x_start, x_to - x_start), slice(y_from - y_start, y_to - y_start)))
+
+    # Converts an index or slice along one axis into a range of points that lies within the world.
+    @staticmethod
+    def bounds(index, size):
+        if isinstance(index, slice):
+            start = 0 if index.start is None else index.start
+            stop = size if index.stop is None else index.stop
+        else:
+            start, stop = index, index + 1
+        return max(start, 0), min(stop, size)
@@ -1,5 +1,6 @@
 from collections import namedtuple
 
-# All elements of a transition have to be torch tensors.
+# All elements of a transition have to be torch tensors. 'discount' is the factor for the value of 'new_state', which
+# is GAMMA to the power of the number of steps the action was repeated for.
 Transition = namedtuple('Transition',
-                        ['state', 'new_state', 'action', 'reward'])
+                        ['state', 'new_state', 'action', 'reward', 'discount'])
@@ -3,7 +3,7 @@ import numpy as np
 import logging
 
 from kivy.uix.widget import Widget
-from kivy.graphics import Color, Line
+from kivy.graphics import Color, Line, PushMatrix, PopMatrix, Translate
 
 from staticParameters import StaticParameters
 
@@ -24,28 +24,47 @@ class WallVisualization(Widget):
     length = 0
     # Determines how thick lines will be displayed in the GUI (the higher this number, the thicker the lines).
     line_width = 30
+    # Lower left corner of the section of the world that is displayed in the GUI
+    viewport = (0, 0)
+
+    # Walls are drawn in world coordinates, the canvas is shifted by the viewport to display them.
+    def __init__(self, **kwargs):
+        super(WallVisualization, self).__init__(**kwargs)
+        with self.canvas.before:
+            PushMatrix()
+            self.translation = Translate(0, 0)
+        with self.canvas.after:
+            PopMatrix()
+
+    # Method 'set_viewport':
+    # Called whenever the displayed section of the world changes.
+    def set_viewport(self, instance, viewport):
+        self.viewport = (viewport[0], viewport[1])
+        self.translation.xy = (-viewport[0], -viewport[1])
 
     # Method 'on_touch_down':
     # This method gets called whenever the user right-clicks at any position in the application window. In anticipation
     # of the users wanting to draw a line, the line parameters are reset.
     def on_touch_down(self, touch):
+        x, y = touch.x + self.viewport[0], touch.y + self.viewport[1]
         with self.canvas:
             Color(1, 1, 1)
-            touch.ud['line'] = Line(points=(touch.x, touch.y))
-            self.position = (int(touch.x), int(touch.y))
+            touch.ud['line'] = Line(points=(x, y))
+            self.position = (int(x), int(y))
             self.number_of_points = 0
             self.length = 0
 
             # set the touched square to 1 in the wall array used by the agent
-            StaticParameters.wall[int(touch.x), int(touch.y)] = 1
+            StaticParameters.wall[int(x), int(y)] = 1
 
     # Method 'on_touch_move':
     # This method is called whenever the user has right-clicked on the application window and drags over it. It also
     # sets a reasonable size for the drawn lines, depending on the speed with which the user draws.
     def on_touch_move(self, touch):
-        touch.ud['line'].points += [touch.x, touch.y]
+        x, y = touch.x + self.viewport[0], touch.y + self.viewport[1]
+        touch.ud['line'].points += [x, y]
 
-        new_position = (int(touch.x), int(touch.y))
+        new_position = (int(x), int(y))
         self.length = self.length + np.sqrt(max((new_position[0] - self.position[0]) ** 2
                                                 + (new_position[1] - self.position[1]) ** 2, 2))
         self.number_of_points = self.number_of_points + 1
@@ -58,5 +77,5 @@ class WallVisualization(Widget):
         self.position = new_position
 
         # set all touched squares to 1 in the wall array used by the agent
-        StaticParameters.wall[int(touch.x) - int(self.line_width / 2): int(touch.x) + int(self.line_width / 2),
-                            int(touch.y) - int(self.line_width / 2): int(touch.y) + int(self.line_width / 2)] = 1
+        StaticParameters.wall[int(x) - int(self.line_width / 2): int(x) + int(self.line_width / 2),
+                            int(y) - int(self.line_width / 2): int(y) + int(self.line_width / 2)] = 1